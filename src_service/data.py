@@ -1,9 +1,11 @@
 """Google Sheets data access wrapper."""
-from typing import Optional, List, Tuple
+from typing import Optional, List, Set, Tuple
 import time
 import csv
 import os
+import queue
 import tempfile
+import threading
 
 from .config import config
 from .logging_utils import (
@@ -14,6 +16,11 @@ from .logging_utils import (
     update_last_google_error,
 )
 
+# Batching parameters for the background log writer: flush once this many
+# rows are queued, or this many seconds after the first row of a batch.
+LOG_BATCH_MAX_ROWS = 10
+LOG_BATCH_FLUSH_SECONDS = 2.0
+
 
 class GoogleSheetsData:
     """Wrapper for Google Sheets access with error handling."""
@@ -30,6 +37,16 @@ class GoogleSheetsData:
         self.sheet = None
         self.log_sheet = None
         self._connected = False
+        # Cached lowercase UID set so each badge scan doesn't hit the Sheets
+        # API (col_values is a network round-trip). Refreshed after the TTL
+        # expires or whenever the badge list is re-downloaded.
+        self._uid_cache: Optional[Set[str]] = None
+        self._uid_cache_time = 0.0
+        self._uid_cache_ttl = float(config.get("UID_CACHE_TTL_SECONDS", 60))
+        # Optional background log batcher (see start_log_batcher). When not
+        # started, log_access writes synchronously as before.
+        self._log_queue: Optional[queue.Queue] = None
+        self._log_thread: Optional[threading.Thread] = None
 
     def connect(self) -> bool:
         """Connect to Google Sheets using service account credentials."""
@@ -124,6 +141,9 @@ class GoogleSheetsData:
                 return False, "Failed to write CSV"
 
             get_logger().info(f"Badge list refreshed: {len(uids)} entries")
+            # Repopulate the UID cache from the list we just fetched
+            self._uid_cache = {u.lower() for u in uids}
+            self._uid_cache_time = time.monotonic()
             # Clear error on success
             update_last_google_error(None)
             return True, f"{len(uids)} badges"
@@ -134,18 +154,98 @@ class GoogleSheetsData:
             update_last_badge_download(success=False)
             return False, msg
 
+    def _cached_uid_set(self) -> Set[str]:
+        """Return the lowercase UID set, fetching from the sheet when stale."""
+        now = time.monotonic()
+        if self._uid_cache is None or now - self._uid_cache_time > self._uid_cache_ttl:
+            self._uid_cache = set(self.get_badge_uids(normalize_lower=True))
+            self._uid_cache_time = now
+        return self._uid_cache
+
     def check_uid_in_sheet(self, uid_hex: str) -> bool:
         """Check if a UID exists in the badge sheet."""
-        uids = self.get_badge_uids(normalize_lower=True)
-        return uid_hex.lower() in uids
+        return uid_hex.lower() in self._cached_uid_set()
+
+    def start_log_batcher(self):
+        """Start the background thread that batches log rows via append_rows.
+
+        Once started, log_access only enqueues rows, so callers on the RFID
+        hot path never block on a Sheets API round-trip. Rows are flushed in
+        batches of LOG_BATCH_MAX_ROWS, or LOG_BATCH_FLUSH_SECONDS after the
+        first row of a batch arrives.
+        """
+        if self._log_queue is not None:
+            return
+        self._log_queue = queue.Queue()
+        self._log_thread = threading.Thread(
+            target=self._log_worker, args=(self._log_queue,), daemon=True, name="SheetLogBatcher"
+        )
+        self._log_thread.start()
+        get_logger().info("Google Sheets log batcher started")
+
+    def stop_log_batcher(self, timeout: float = 5.0):
+        """Stop the log batcher, flushing any queued rows first."""
+        q = self._log_queue
+        thread = self._log_thread
+        self._log_queue = None
+        self._log_thread = None
+        if q is None or thread is None:
+            return
+        q.put(None)  # sentinel: flush remaining rows and exit
+        thread.join(timeout)
+
+    def _log_worker(self, q: "queue.Queue"):
+        """Drain the log queue, writing rows in batches."""
+        while True:
+            item = q.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + LOG_BATCH_FLUSH_SECONDS
+            while len(batch) < LOG_BATCH_MAX_ROWS:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    nxt = q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    self._flush_log_batch(batch)
+                    return
+                batch.append(nxt)
+            self._flush_log_batch(batch)
+
+    def _flush_log_batch(self, batch: List[List[str]]):
+        """Write a batch of log rows to the log sheet (best effort)."""
+        if not self._connected or self.log_sheet is None:
+            get_logger().warning(f"Dropping {len(batch)} log rows: Google Sheets not connected")
+            return
+        try:
+            self.log_sheet.append_rows(batch, value_input_option="RAW")
+            update_last_google_log_success()
+            get_logger().debug(f"Flushed {len(batch)} log rows to Google Sheets")
+        except Exception as e:
+            update_last_google_error(str(e))
+            get_logger().warning(f"Failed to flush log batch to Google Sheets: {e}")
 
     def log_access(self, uid: str, status: str) -> bool:
-        """Append an access event to the log sheet."""
+        """Append an access event to the log sheet.
+
+        With the log batcher running this only enqueues the row; otherwise it
+        writes synchronously.
+        """
         if not self._connected or self.log_sheet is None:
             return False
 
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+
+        q = self._log_queue
+        if q is not None:
+            q.put([timestamp, uid, status])
+            return True
+
         try:
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
             self.log_sheet.append_row([timestamp, uid, status])
             update_last_google_log_success()
             get_logger().debug(f"Successfully logged to Google Sheets: {uid} - {status}")
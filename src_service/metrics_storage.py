@@ -1,11 +1,15 @@
 """SQLite-backed monthly metrics storage and cross-month query helpers."""
 import csv
+import functools
+import heapq
+import math
 import os
 import re
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from io import StringIO
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence
 
 from .config import config
 
@@ -22,19 +26,103 @@ CREATE TABLE IF NOT EXISTS events (
 );
 """
 
+# Secondary (query) indexes. These can be built after a bulk ingest so inserts don't
+# pay incremental B-tree maintenance per row.
 EVENTS_INDEX_SQL = (
     "CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);",
-    "CREATE INDEX IF NOT EXISTS idx_events_event_type ON events(event_type);",
+    # Composite index matching the dominant dashboard filter shape
+    # (WHERE ts BETWEEN ? AND ? AND event_type IN (...)); its event_type
+    # prefix also covers the old single-column index, dropped below.
+    "CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events(event_type, ts);",
+    "DROP INDEX IF EXISTS idx_events_event_type;",
     "CREATE INDEX IF NOT EXISTS idx_events_badge_id ON events(badge_id);",
-    # Prevent importing the same source line twice
-    "CREATE UNIQUE INDEX IF NOT EXISTS idx_events_imported_file_line ON events(imported_file, imported_line_number);",
 )
 
+# Prevent importing the same source line twice. Unlike the query indexes this must
+# exist during ingest: INSERT OR IGNORE relies on it for dedup.
+EVENTS_UNIQUE_INDEX_SQL = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_events_imported_file_line ON events(imported_file, imported_line_number);"
+)
+
+# Single compiled pattern that captures timestamp, event, optional badge and status in
+# one scan, instead of a prefix match followed by per-line split/rsplit passes.
 _ACTION_LINE_RE = re.compile(
-    r"^(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - [^-]+ - [A-Z]+ - (?P<message>.*)$"
+    r"^(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - [^-]+ - [A-Z]+ - "
+    r"(?P<event>.*?)(?: - Badge: (?P<badge>.*))? - Status: (?P<status>.*)$"
 )
-_BADGE_PART = " - Badge: "
 _STATUS_PART = " - Status: "
+# Bytes variant used to pre-filter raw lines during ingest before any decode.
+_STATUS_PART_B = _STATUS_PART.encode("ascii")
+
+_INSERT_EVENT_SQL = (
+    "INSERT OR IGNORE INTO events "
+    "(ts, event_type, badge_id, status, raw_message, imported_file, imported_line_number) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+# Flush bulk inserts in bounded chunks so one huge month doesn't pin a giant parameter list
+_INSERT_BATCH_SIZE = 10000
+
+# WAL avoids writer/reader lock contention, synchronous=NORMAL cuts fsyncs per commit
+# (still crash-safe; only the last uncommitted txn is at risk on power loss), and the
+# cache/mmap settings reduce page-cache misses on cross-month scans.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-65536;",
+    "PRAGMA mmap_size=268435456;",
+    "PRAGMA busy_timeout=5000;",
+)
+
+
+_READONLY_PRAGMAS = (
+    "PRAGMA query_only=1;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-65536;",
+    "PRAGMA mmap_size=268435456;",
+    "PRAGMA busy_timeout=5000;",
+)
+
+
+def _configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply tuned PRAGMAs to a freshly opened metrics db connection."""
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _connect_readonly(db_path: str) -> sqlite3.Connection:
+    """Open a metrics db for querying via a read-only URI connection.
+
+    mode=ro guarantees queries can never write, and the query_only pragma
+    backstops that on the fallback path. Deliberately NOT immutable=1: the
+    manual reload endpoint and month-rollover ingest can commit to any month
+    (even a past one), and SQLite gives undefined results if a file changes
+    under an immutable connection. Falls back to a plain read-write
+    connection if the URI open fails.
+    """
+    from urllib.request import pathname2url
+
+    uri = "file:{0}?mode=ro".format(pathname2url(os.path.abspath(db_path)))
+    try:
+        # check_same_thread=False: query connections may be opened on a worker
+        # thread and consumed on the caller's thread (never concurrently).
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        for pragma in _READONLY_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    except sqlite3.Error:
+        return _configure_connection(sqlite3.connect(db_path, check_same_thread=False))
+
+
+# Monotonic counter bumped whenever an ingest commits new rows. Response caches
+# include it in their keys so fresh data invalidates them without coordination.
+_events_version = 0
+
+
+def events_version() -> int:
+    """Return the current events-data version (bumps on successful ingest)."""
+    return _events_version
 
 
 def get_metrics_base_path() -> str:
@@ -97,50 +185,49 @@ def get_month_db_path(month_key: str, base_path: Optional[str] = None) -> str:
     return os.path.join(base, year, "{0}.db".format(month_key))
 
 
-def ensure_month_db(month_key: str, base_path: Optional[str] = None) -> str:
-    """Create month db/schema if missing and return its path."""
+def ensure_month_table(month_key: str, base_path: Optional[str] = None) -> str:
+    """Create month db, events table and dedup index if missing; skip query indexes.
+
+    Used by the ingest path so bulk inserts don't pay per-row maintenance on the
+    secondary indexes; call `ensure_month_indexes` after the ingest commits.
+    """
     db_path = get_month_db_path(month_key, base_path=base_path)
     db_dir = os.path.dirname(db_path)
     if db_dir:
         os.makedirs(db_dir, exist_ok=True)
     conn = sqlite3.connect(db_path)
     try:
+        _configure_connection(conn)
         conn.execute(EVENTS_TABLE_SQL)
-        for stmt in EVENTS_INDEX_SQL:
-            conn.execute(stmt)
+        conn.execute(EVENTS_UNIQUE_INDEX_SQL)
         conn.commit()
     finally:
         conn.close()
     return db_path
 
 
-def _parse_action_message(message: str) -> Optional[Dict[str, str]]:
-    badge_id = None
-    event_type = None
-    status = "Unknown"
-
-    raw_event = None
-    if _BADGE_PART in message and _STATUS_PART in message:
-        left, right = message.split(_BADGE_PART, 1)
-        badge_part, status_part = right.rsplit(_STATUS_PART, 1)
-        raw_event = left.strip()
-        badge_id = badge_part.strip() or None
-        status = normalize_status(status_part)
-    elif _STATUS_PART in message:
-        left, status_part = message.rsplit(_STATUS_PART, 1)
-        raw_event = left.strip()
-        status = normalize_status(status_part)
-    else:
-        # Message didn't match expected patterns
-        return None
-
-    if not raw_event:
-        return None
+def ensure_month_indexes(month_key: str, base_path: Optional[str] = None) -> str:
+    """Build the secondary query indexes for a month db (idempotent)."""
+    db_path = get_month_db_path(month_key, base_path=base_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        _configure_connection(conn)
+        for stmt in EVENTS_INDEX_SQL:
+            conn.execute(stmt)
+        # Refresh planner statistics so the optimizer actually picks the
+        # composite index for range-within-type scans.
+        conn.execute("ANALYZE;")
+        conn.commit()
+    finally:
+        conn.close()
+    return db_path
 
-    # Normalize event type using helper
-    event_type = normalize_event_type(raw_event)
 
-    return {"event_type": event_type, "badge_id": badge_id, "status": status}
+def ensure_month_db(month_key: str, base_path: Optional[str] = None) -> str:
+    """Create month db/schema (table plus all indexes) if missing and return its path."""
+    db_path = ensure_month_table(month_key, base_path=base_path)
+    ensure_month_indexes(month_key, base_path=base_path)
+    return db_path
 
 
 def parse_action_log_line(line: str) -> Optional[Dict[str, str]]:
@@ -149,17 +236,27 @@ def parse_action_log_line(line: str) -> Optional[Dict[str, str]]:
     if not raw:
         return None
 
+    # Cheap substring gate: most log lines are non-action noise, and a C-level
+    # contains check is far cheaper than running the regex to failure.
+    if _STATUS_PART not in raw:
+        return None
+
     match = _ACTION_LINE_RE.match(raw)
     if not match:
         return None
 
-    parsed = _parse_action_message(match.group("message"))
-    if parsed is None:
+    raw_event = match.group("event").strip()
+    if not raw_event:
         return None
 
-    parsed["ts"] = match.group("ts")
-    parsed["raw_message"] = raw
-    return parsed
+    badge = match.group("badge")
+    return {
+        "event_type": normalize_event_type(raw_event),
+        "badge_id": (badge.strip() or None) if badge is not None else None,
+        "status": normalize_status(match.group("status")),
+        "ts": match.group("ts"),
+        "raw_message": raw,
+    }
 
 
 def ingest_action_log_file(path: str, base_path: Optional[str] = None, delete_file: bool = True) -> int:
@@ -177,78 +274,100 @@ def ingest_action_log_file(path: str, base_path: Optional[str] = None, delete_fi
     if not os.path.exists(path):
         return 0
 
-    events_to_insert = []
     kept_lines = []
-
-    # Read and parse lines (capture source file and line number)
-    basename = os.path.basename(path)
-    with open(path, "r", encoding="utf-8", errors="replace") as fh:
-        for lineno, line in enumerate(fh, start=1):
-            parsed = parse_action_log_line(line)
-            if parsed is None:
-                kept_lines.append(line)
-                continue
-            parsed["imported_file"] = basename
-            parsed["imported_line_number"] = lineno
-            events_to_insert.append(parsed)
-
-    if not events_to_insert:
-        # Nothing to insert; if delete_file True and file only had non-action lines, leave it alone
-        return 0
-
-    # Group events by month_key for bulk insert
-    grouped: Dict[str, List[Dict[str, str]]] = {}
-    for ev in events_to_insert:
-        try:
-            ts = datetime.strptime(ev["ts"], "%Y-%m-%d %H:%M:%S")
-        except Exception:
-            # skip malformed
-            continue
-        month_key = _month_key_for_datetime(ts)
-        grouped.setdefault(month_key, []).append(ev)
+    batches: Dict[str, List[tuple]] = {}
+    # Per-month caches so schema setup and connection open happen once per month,
+    # not once per line: month_key -> db path / open connection / changes at BEGIN.
+    ensured: Dict[str, str] = {}
+    conns: Dict[str, sqlite3.Connection] = {}
+    changes_at_begin: Dict[str, int] = {}
+
+    def _month_conn(month_key: str) -> sqlite3.Connection:
+        conn = conns.get(month_key)
+        if conn is None:
+            db_path = ensured.get(month_key) or ensured.setdefault(
+                month_key, ensure_month_table(month_key, base_path=base_path)
+            )
+            conn = sqlite3.connect(db_path)
+            _configure_connection(conn)
+            conn.execute("BEGIN")
+            changes_at_begin[month_key] = conn.total_changes
+            conns[month_key] = conn
+        return conn
 
     inserted = 0
-    for month_key, rows in grouped.items():
-        db_path = ensure_month_db(month_key, base_path=base_path)
-        conn = sqlite3.connect(db_path)
-        try:
-            conn.execute("PRAGMA journal_mode=WAL;")
-            conn.execute("PRAGMA synchronous=OFF;")
-            cur = conn.cursor()
-            cur.execute("BEGIN")
-            before_changes = conn.total_changes
-            cur.executemany(
-                "INSERT OR IGNORE INTO events (ts, event_type, badge_id, status, raw_message, imported_file, imported_line_number) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                [
+    try:
+        # Read and parse lines (capture source file and line number), batching insert
+        # tuples per month. The regex guarantees a fixed-width "YYYY-MM-DD HH:MM:SS"
+        # timestamp, so the month key is just ts[:7].
+        basename = os.path.basename(path)
+        # Binary mode with a 1 MiB buffer: most lines are non-action noise, so
+        # gate on the raw status marker and only decode the candidate lines.
+        with open(path, "rb", buffering=1 << 20) as fh:
+            for lineno, line in enumerate(fh, start=1):
+                if _STATUS_PART_B not in line:
+                    kept_lines.append(line)
+                    continue
+                parsed = parse_action_log_line(line.decode("utf-8", errors="replace"))
+                if parsed is None:
+                    kept_lines.append(line)
+                    continue
+                month_key = parsed["ts"][:7]
+                batch = batches.setdefault(month_key, [])
+                batch.append(
                     (
-                        r["ts"],
-                        r.get("event_type"),
-                        r.get("badge_id"),
-                        r.get("status"),
-                        r.get("raw_message"),
-                        r.get("imported_file"),
-                        r.get("imported_line_number"),
+                        parsed["ts"],
+                        parsed["event_type"],
+                        parsed["badge_id"],
+                        parsed["status"],
+                        parsed["raw_message"],
+                        basename,
+                        lineno,
                     )
-                    for r in rows
-                ],
-            )
+                )
+                if len(batch) >= _INSERT_BATCH_SIZE:
+                    # executemany is the pysqlite fast path: the statement is
+                    # prepared once and bound/stepped in C for the whole batch.
+                    _month_conn(month_key).executemany(_INSERT_EVENT_SQL, batch)
+                    batch.clear()
+
+        # Flush remaining partial batches and commit each month once
+        for month_key, batch in batches.items():
+            if batch:
+                _month_conn(month_key).executemany(_INSERT_EVENT_SQL, batch)
+        for month_key, conn in conns.items():
             conn.commit()
-            # Compute how many rows were actually inserted in this connection
-            after_changes = conn.total_changes
-            inserted += (after_changes - before_changes)
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
+            inserted += conn.total_changes - changes_at_begin[month_key]
+        if inserted:
+            global _events_version
+            _events_version += 1
+    except Exception:
+        for conn in conns.values():
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+        raise
+    finally:
+        for conn in conns.values():
             conn.close()
 
+    # Build query indexes once per touched month, after the bulk commit; a sorted
+    # sequential rebuild is far cheaper than per-row index maintenance during insert.
+    for month_key in ensured:
+        ensure_month_indexes(month_key, base_path=base_path)
+
+    if not batches:
+        # Nothing to insert; if delete_file True and file only had non-action lines, leave it alone
+        return 0
+
     # If requested, write back kept_lines (non-action lines) atomically; otherwise leave file as-is
     if delete_file:
         import tempfile
         import shutil
         fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.')
         try:
-            with os.fdopen(fd, "w", encoding="utf-8") as outfh:
+            with os.fdopen(fd, "wb") as outfh:
                 outfh.writelines(kept_lines)
             shutil.move(tmp, path)
         except Exception:
@@ -264,29 +383,51 @@ def month_keys_in_range(start_date: date, end_date: date) -> List[str]:
     """Return inclusive YYYY-MM keys spanning start_date..end_date."""
     if end_date < start_date:
         return []
-    months: List[str] = []
-    cur = date(start_date.year, start_date.month, 1)
-    final = date(end_date.year, end_date.month, 1)
-    while cur <= final:
-        months.append("{0:04d}-{1:02d}".format(cur.year, cur.month))
-        if cur.month == 12:
-            cur = date(cur.year + 1, 1, 1)
-        else:
-            cur = date(cur.year, cur.month + 1, 1)
-    return months
+    # Walk a single year*12+month counter instead of allocating a date per month
+    start_ym = start_date.year * 12 + start_date.month - 1
+    end_ym = end_date.year * 12 + end_date.month - 1
+    return [
+        "{0:04d}-{1:02d}".format(ym // 12, ym % 12 + 1)
+        for ym in range(start_ym, end_ym + 1)
+    ]
+
+
+# Db files already confirmed on disk. Only positive results are cached: a month
+# that doesn't exist yet may be created by the next ingest, so misses must keep
+# hitting the filesystem. (Stale entries only occur if a db file is deleted
+# externally, which nothing in the service does.)
+_known_db_paths: set = set()
+
+
+@functools.lru_cache(maxsize=32)
+def _ensured_month_db(month_key: str, base_path: str) -> str:
+    """Run current-month schema setup once per (month, resolved base path).
+
+    base_path must already be resolved (never None): keying on the raw
+    argument would collapse different configured directories onto one cache
+    entry. Keyed by month, so the cache naturally rolls over with the
+    calendar; call `_ensured_month_db.cache_clear()` in test teardown.
+    """
+    return ensure_month_db(month_key, base_path=base_path)
 
 
 def db_paths_in_range(start_date: date, end_date: date, base_path: Optional[str] = None) -> List[str]:
     """Return existing db paths in range; create current-month db when missing."""
     paths: List[str] = []
+    base = base_path or get_metrics_base_path()
     now_key = datetime.now().strftime("%Y-%m")
     for month_key in month_keys_in_range(start_date, end_date):
-        db_path = get_month_db_path(month_key, base_path=base_path)
+        db_path = get_month_db_path(month_key, base_path=base)
+        if db_path in _known_db_paths:
+            paths.append(db_path)
+            continue
         if os.path.exists(db_path):
+            _known_db_paths.add(db_path)
             paths.append(db_path)
             continue
         if month_key == now_key:
-            ensure_month_db(month_key, base_path=base_path)
+            _ensured_month_db(month_key, base)
+            _known_db_paths.add(db_path)
             paths.append(db_path)
     return paths
 
@@ -317,91 +458,185 @@ def build_union_all_query(aliases: Sequence[str], where_clause: str = "") -> str
     return " UNION ALL ".join(select_parts)
 
 
-def _event_row(row: Tuple[str, str, Optional[str], str, str]) -> Dict[str, Optional[str]]:
-    return {
-        "ts": row[0],
-        "event_type": row[1],
-        "badge_id": row[2],
-        "status": row[3],
-        "raw_message": row[4],
-    }
+def iter_events_range(
+    start_ts: str,
+    end_ts: str,
+    event_types: Optional[Sequence[str]] = None,
+) -> Iterator[sqlite3.Row]:
+    """Yield normalized events across monthly databases in timestamp range.
+
+    Rows are sqlite3.Row objects (C-implemented, dict-style access via
+    row["ts"] etc.) rather than per-row dicts, avoiding one dict allocation
+    and five hash inserts per event.
+
+    Events are yielded in ascending ts order: each month db is read with
+    ORDER BY ts (pushed into sqlite where idx_events_ts applies) and the
+    per-month cursors are combined with a k-way heapq.merge, so the stream
+    is globally sorted with O(months) memory and no outer sort pass.
+    """
+    start_date = datetime.strptime(start_ts, "%Y-%m-%d %H:%M:%S").date()
+    end_date = datetime.strptime(end_ts, "%Y-%m-%d %H:%M:%S").date()
+    db_paths = db_paths_in_range(start_date, end_date)
+    if not db_paths:
+        return
+
+    # Query each monthly DB individually to avoid hitting SQLite attached database
+    # limits. SQL text and bound parameters are built exactly once and shared by
+    # every month's execute, so the statement is prepared/bound per month, not per
+    # alias-duplicated UNION branch.
+    where = "WHERE ts >= ? AND ts <= ?"
+    params: List[str] = [start_ts, end_ts]
+    if event_types:
+        placeholders = ",".join(["?"] * len(event_types))
+        where += " AND event_type IN ({0})".format(placeholders)
+        params.extend(event_types)
+    sql = (
+        "SELECT ts, event_type, badge_id, status, raw_message "
+        f"FROM events {where} ORDER BY ts"
+    )
+    params_t = tuple(params)
+
+    def _open_and_exec(db_path: str):
+        """Open one month read-only and start its query; (conn, cursor-or-None)."""
+        try:
+            c = _connect_readonly(db_path)
+        except Exception:
+            # If a single DB fails to open, log and continue with others
+            from .logging_utils import get_logger
+            get_logger().warning(f"Failed to open metrics DB {db_path}")
+            return None
+        try:
+            c.row_factory = sqlite3.Row
+            return c, c.execute(sql, params_t)
+        except Exception:
+            from .logging_utils import get_logger
+            get_logger().warning(f"Failed to query metrics DB {db_path}")
+            return c, None
+
+    conns: List[sqlite3.Connection] = []
+    cursors = []
+    try:
+        # Kick off each month's execute on a worker thread: sqlite releases the
+        # GIL while stepping, so cold-cache reads across months overlap instead
+        # of serializing. Connections are handed back to this thread for the
+        # merge (opened with check_same_thread=False; one thread at a time).
+        with ThreadPoolExecutor(max_workers=min(8, len(db_paths))) as ex:
+            results = list(ex.map(_open_and_exec, db_paths))
+        for result in results:
+            if result is None:
+                continue
+            c, cursor = result
+            conns.append(c)
+            if cursor is not None:
+                cursors.append(cursor)
+
+        for row in heapq.merge(*cursors, key=lambda r: r[0]):
+            yield row
+    finally:
+        for c in conns:
+            c.close()
 
 
 def query_events_range(
     start_ts: str,
     end_ts: str,
     event_types: Optional[Sequence[str]] = None,
-) -> List[Dict[str, Optional[str]]]:
+) -> List[sqlite3.Row]:
     """Query normalized events across monthly databases in timestamp range."""
+    return list(iter_events_range(start_ts, end_ts, event_types=event_types))
+
+
+def count_events_range(
+    start_ts: str,
+    end_ts: str,
+    event_types: Optional[Sequence[str]] = None,
+) -> int:
+    """Count events in range across monthly databases without materializing rows.
+
+    COUNT(*) over the indexed ts range per month db, summed — callers that only
+    need a total (e.g. pagination metadata) can use this instead of loading the
+    full range.
+    """
     start_date = datetime.strptime(start_ts, "%Y-%m-%d %H:%M:%S").date()
     end_date = datetime.strptime(end_ts, "%Y-%m-%d %H:%M:%S").date()
-    db_paths = db_paths_in_range(start_date, end_date)
-    if not db_paths:
-        return []
 
-    # Query each monthly DB individually to avoid hitting SQLite attached database limits.
-    rows: List[Tuple[str, str, Optional[str], str, str]] = []
-    for db_path in db_paths:
+    where = "WHERE ts >= ? AND ts <= ?"
+    params: List[str] = [start_ts, end_ts]
+    if event_types:
+        placeholders = ",".join(["?"] * len(event_types))
+        where += " AND event_type IN ({0})".format(placeholders)
+        params.extend(event_types)
+    sql = f"SELECT COUNT(*) FROM events {where}"
+    params_t = tuple(params)
+
+    total = 0
+    for db_path in db_paths_in_range(start_date, end_date):
         try:
-            c = sqlite3.connect(db_path)
-            try:
-                where = "WHERE ts >= ? AND ts <= ?"
-                params: List[str] = [start_ts, end_ts]
-                if event_types:
-                    placeholders = ",".join(["?"] * len(event_types))
-                    where += " AND event_type IN ({0})".format(placeholders)
-                    params.extend(event_types)
-                sql = (
-                    "SELECT ts, event_type, badge_id, status, raw_message "
-                    f"FROM events {where}"
-                )
-                fetched = c.execute(sql, tuple(params)).fetchall()
-                if fetched:
-                    rows.extend(fetched)
-            finally:
-                c.close()
+            conn = _connect_readonly(db_path)
         except Exception:
-            # If a single DB fails to open or query, log and continue with others
-            try:
-                get_logger().warning(f"Failed to query metrics DB {db_path}")
-            except Exception:
-                pass
-
-    # Sort globally by timestamp (ISO datetime strings sort lexicographically)
-    rows.sort(key=lambda r: r[0])
-    return [_event_row(row) for row in rows]
+            from .logging_utils import get_logger
+            get_logger().warning(f"Failed to open metrics DB {db_path}")
+            continue
+        try:
+            total += conn.execute(sql, params_t).fetchone()[0]
+        except Exception:
+            from .logging_utils import get_logger
+            get_logger().warning(f"Failed to count metrics DB {db_path}")
+        finally:
+            conn.close()
+    return total
 
 
-def query_month_events(month_key: str) -> List[Dict[str, Optional[str]]]:
+def query_month_events(month_key: str) -> List[sqlite3.Row]:
     """Return all events from a specific month db."""
     db_path = get_month_db_path(month_key)
     if not os.path.exists(db_path):
         return []
-    conn = sqlite3.connect(db_path)
+    conn = _connect_readonly(db_path)
     try:
-        rows = conn.execute(
+        conn.row_factory = sqlite3.Row
+        return conn.execute(
             "SELECT ts, event_type, badge_id, status, raw_message FROM events ORDER BY ts ASC"
         ).fetchall()
-        return [_event_row(row) for row in rows]
     finally:
         conn.close()
 
 
-def month_events_to_csv(events: Sequence[Dict[str, Optional[str]]]) -> str:
-    """Serialize event records to CSV."""
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["ts", "event_type", "badge_id", "status", "raw_message"])
-    for item in events:
-        writer.writerow(
-            [
-                item.get("ts"),
-                item.get("event_type"),
-                item.get("badge_id"),
-                item.get("status"),
-                item.get("raw_message"),
-            ]
+CSV_HEADER = ["ts", "event_type", "badge_id", "status", "raw_message"]
+
+
+def stream_month_csv(month_key: str, out) -> None:
+    """Write a month's events as CSV directly to a file-like object.
+
+    Rows are streamed straight from the database cursor so peak memory
+    stays constant regardless of how large the month is.
+    """
+    writer = csv.writer(out)
+    writer.writerow(CSV_HEADER)
+    db_path = get_month_db_path(month_key)
+    if not os.path.exists(db_path):
+        return
+    conn = _connect_readonly(db_path)
+    try:
+        # Cursor rows are already tuples in column order; writerows consumes
+        # the iterable in a single C-level loop.
+        writer.writerows(
+            conn.execute(
+                "SELECT ts, event_type, badge_id, status, raw_message FROM events ORDER BY ts ASC"
+            )
         )
+    finally:
+        conn.close()
+
+
+def month_events_to_csv(month_key: str) -> str:
+    """Serialize a month's events to a CSV string.
+
+    Thin wrapper over stream_month_csv for callers that want the CSV in
+    memory rather than streamed to a file-like object.
+    """
+    output = StringIO()
+    stream_month_csv(month_key, output)
     return output.getvalue()
 
 
@@ -432,6 +667,24 @@ def _normalize_event_type_py(raw_event: Optional[str]) -> str:
     return key or et
 
 
+def _parse_ts(s: Optional[str]) -> Optional[datetime]:
+    """Parse a fixed-width 'YYYY-MM-DD HH:MM:SS' timestamp without strptime.
+
+    Hot path for the pairing helpers below: slicing the known offsets and
+    calling the datetime constructor directly skips the locale and regex
+    machinery inside datetime.strptime, which dominates per-event loops.
+    """
+    if not s or len(s) != 19:
+        return None
+    try:
+        return datetime(
+            int(s[0:4]), int(s[5:7]), int(s[8:10]),
+            int(s[11:13]), int(s[14:16]), int(s[17:19]),
+        )
+    except ValueError:
+        return None
+
+
 def compute_open_durations(events: Sequence[Dict[str, Optional[str]]]) -> List[Dict[str, Optional[float]]]:
     """Compute open->close durations (seconds) by pairing chronological events.
 
@@ -440,40 +693,35 @@ def compute_open_durations(events: Sequence[Dict[str, Optional[str]]]) -> List[D
     Pairing strategy: sort 'open' events and 'close' events separately by timestamp, then for each open
     find the next close with ts > open.ts and pair them once. Unpaired opens are ignored.
     """
-    opens = []
-    closes = []
+    # Decorate with the parsed timestamp up front so each event is parsed once,
+    # not once per sort comparison plus once per pairing step.
+    opens: List[tuple] = []
+    closes: List[tuple] = []
     for e in events:
         et = _normalize_event_type_py(e.get("event_type"))
-        if et == "open":
-            opens.append(e)
-        elif et == "close":
-            closes.append(e)
-    def _to_dt(s: str) -> Optional[datetime]:
-        try:
-            return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
-        except Exception:
-            return None
-    opens_sorted = sorted(opens, key=lambda x: _to_dt(x.get("ts") or "" ) or datetime.min)
-    closes_sorted = sorted(closes, key=lambda x: _to_dt(x.get("ts") or "" ) or datetime.min)
+        if et != "open" and et != "close":
+            continue
+        dt = _parse_ts(e.get("ts"))
+        if dt is None:
+            continue
+        (opens if et == "open" else closes).append((dt, e))
+    opens.sort(key=lambda pair: pair[0])
+    closes.sort(key=lambda pair: pair[0])
 
     results: List[Dict[str, Optional[float]]] = []
     cidx = 0
-    for o in opens_sorted:
-        o_dt = _to_dt(o.get("ts") or "")
-        if o_dt is None:
-            continue
+    for o_dt, o in opens:
         # advance to a close strictly after open
-        while cidx < len(closes_sorted):
-            c_dt = _to_dt(closes_sorted[cidx].get("ts") or "")
-            if c_dt is None or c_dt <= o_dt:
+        while cidx < len(closes):
+            c_dt, c = closes[cidx]
+            if c_dt <= o_dt:
                 cidx += 1
                 continue
             # pair
-            duration = (c_dt - o_dt).total_seconds()
             results.append({
                 "open_ts": o.get("ts"),
-                "close_ts": closes_sorted[cidx].get("ts"),
-                "duration": duration,
+                "close_ts": c.get("ts"),
+                "duration": (c_dt - o_dt).total_seconds(),
                 "badge_id": o.get("badge_id") or None,
             })
             cidx += 1
@@ -486,35 +734,35 @@ def compute_scan_to_open_latencies(events: Sequence[Dict[str, Optional[str]]], m
 
     Returns list of dicts: {'scan_ts', 'open_ts', 'delta', 'badge_id'}
     """
-    scans = [e for e in events if _normalize_event_type_py(e.get("event_type")) == "scan"]
-    opens = [e for e in events if _normalize_event_type_py(e.get("event_type")) == "open"]
-
-    def _to_dt(s: str) -> Optional[datetime]:
-        try:
-            return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
-        except Exception:
-            return None
-
-    scans_sorted = sorted(scans, key=lambda x: _to_dt(x.get("ts") or "") or datetime.min)
-    opens_sorted = sorted(opens, key=lambda x: _to_dt(x.get("ts") or "") or datetime.min)
+    # Same decorate-sort-undecorate shape as compute_open_durations: parse each
+    # timestamp once, then the two-pointer walk compares pre-parsed datetimes.
+    scans: List[tuple] = []
+    opens: List[tuple] = []
+    for e in events:
+        et = _normalize_event_type_py(e.get("event_type"))
+        if et != "scan" and et != "open":
+            continue
+        dt = _parse_ts(e.get("ts"))
+        if dt is None:
+            continue
+        (scans if et == "scan" else opens).append((dt, e))
+    scans.sort(key=lambda pair: pair[0])
+    opens.sort(key=lambda pair: pair[0])
 
+    # Single shared index into the sorted opens list: both lists are walked
+    # once in total (O(scans + opens)), with no per-badge queues to maintain.
     res: List[Dict[str, Optional[float]]] = []
     oidx = 0
-    for s in scans_sorted:
-        s_dt = _to_dt(s.get("ts") or "")
-        if s_dt is None:
-            continue
-        while oidx < len(opens_sorted) and ( _to_dt(opens_sorted[oidx].get("ts") or "") or datetime.min ) < s_dt:
+    for s_dt, s in scans:
+        while oidx < len(opens) and opens[oidx][0] < s_dt:
             oidx += 1
-        if oidx < len(opens_sorted):
-            o_dt = _to_dt(opens_sorted[oidx].get("ts") or "")
-            if o_dt is None:
-                continue
+        if oidx < len(opens):
+            o_dt, o = opens[oidx]
             delta = (o_dt - s_dt).total_seconds()
             if 0 <= delta <= max_window:
                 res.append({
                     "scan_ts": s.get("ts"),
-                    "open_ts": opens_sorted[oidx].get("ts"),
+                    "open_ts": o.get("ts"),
                     "delta": delta,
                     "badge_id": s.get("badge_id") or None,
                 })
@@ -523,15 +771,15 @@ def compute_scan_to_open_latencies(events: Sequence[Dict[str, Optional[str]]], m
 
 def compute_basic_stats(values: Sequence[float]) -> Dict[str, Optional[float]]:
     """Return simple stats: count, avg, median, p95 (or None for empty)."""
-    import statistics
     if not values:
         return {"count": 0, "avg": None, "median": None, "p95": None}
     vals = sorted(values)
     count = len(vals)
     avg = sum(vals) / count
-    median = statistics.median(vals)
+    # median of an already-sorted list, without re-sorting via statistics.median
+    mid = count // 2
+    median = vals[mid] if count % 2 else (vals[mid - 1] + vals[mid]) / 2
     # p95 (use ceiling-based index to include high-tail values for small samples)
-    import math
     idx = min(count - 1, max(0, math.ceil(0.95 * count) - 1))
     p95 = vals[idx]
     return {"count": count, "avg": avg, "median": median, "p95": p95}
@@ -1,4 +1,6 @@
 """OpenAPI (Swagger) spec generator for the Door Controller API."""
+import functools
+import json
 from typing import Dict, Optional
 from .config import config
 from .logging_utils import logger
@@ -7,42 +9,15 @@ from .version import __version__
 GRAPH_DATA_DESCRIPTION = "Graph data"
 
 
-def get_openapi_spec(host: Optional[str] = None) -> Dict:
-    """Return an OpenAPI 3.0 spec as a Python dict.
-
-    If `host` is provided (for example the HTTP Host header from the request), it
-    will be used to construct the `servers` URL. `host` may be a hostname, hostname:port,
-    or a full URL (including scheme). When not provided, falls back to configuration
-    or localhost.
-    """
-    port = config.get("HEALTH_SERVER_PORT", 8080)
-
-    logger.debug(f"get_openapi_spec called with host={host!r}, port={port}")
-
-    if host:
-        # If a full URL is provided, use it directly
-        if host.startswith('http://') or host.startswith('https://'):
-            server_url = host
-        else:
-            # If host already includes a port, don't append one
-            if ':' in host:
-                server_url = f"http://{host}"
-            else:
-                server_url = f"http://{host}:{port}"
-    else:
-        cfg_host = config.get("HEALTH_SERVER_HOST", "localhost")
-        server_url = f"http://{cfg_host}:{port}"
-
-    logger.debug(f"Calculated server_url={server_url!r}")
-
-    spec = {
+def _build_static_spec() -> Dict:
+    """Build the host-independent part of the OpenAPI spec (no `servers` key)."""
+    return {
         "openapi": "3.0.0",
         "info": {
             "title": "Door Controller API",
             "version": __version__,
             "description": "API endpoints for managing and inspecting the Door Controller"
         },
-        "servers": [{"url": server_url}],
         "components": {
             "securitySchemes": {
                 "basicAuth": {
@@ -140,4 +115,49 @@ def get_openapi_spec(host: Optional[str] = None) -> Dict:
         }
     }
 
-    return spec
+
+# Built once at import; everything except the `servers` URL is static, so each
+# request only needs a shallow copy with `servers` patched in. The nested dicts
+# are shared by reference — callers treat the spec as read-only.
+_SPEC_TEMPLATE = _build_static_spec()
+
+
+@functools.lru_cache(maxsize=16)
+def _server_url(host: Optional[str], port) -> str:
+    """Resolve the servers URL for a given Host header value and configured port."""
+    if host:
+        # If a full URL is provided, use it directly
+        if host.startswith('http://') or host.startswith('https://'):
+            return host
+        # If host already includes a port, don't append one
+        if ':' in host:
+            return f"http://{host}"
+        return f"http://{host}:{port}"
+    cfg_host = config.get("HEALTH_SERVER_HOST", "localhost")
+    return f"http://{cfg_host}:{port}"
+
+
+def get_openapi_spec(host: Optional[str] = None) -> Dict:
+    """Return an OpenAPI 3.0 spec as a Python dict.
+
+    If `host` is provided (for example the HTTP Host header from the request), it
+    will be used to construct the `servers` URL. `host` may be a hostname, hostname:port,
+    or a full URL (including scheme). When not provided, falls back to configuration
+    or localhost.
+    """
+    port = config.get("HEALTH_SERVER_PORT", 8080)
+
+    server_url = _server_url(host, port)
+    logger.debug(f"get_openapi_spec called with host={host!r}, server_url={server_url!r}")
+
+    return {**_SPEC_TEMPLATE, "servers": [{"url": server_url}]}
+
+
+@functools.lru_cache(maxsize=32)
+def get_openapi_spec_json(host: Optional[str] = None) -> bytes:
+    """Return the spec pre-serialized as JSON bytes, cached per host value.
+
+    Saves re-serializing the same ~3 KB dict on every /openapi.json hit. Call
+    `get_openapi_spec_json.cache_clear()` if the configuration is reloaded.
+    """
+    return json.dumps(get_openapi_spec(host), separators=(",", ":")).encode("utf-8")
@@ -38,8 +38,9 @@ from datetime import datetime
 import socket
 import os
 import re
-from io import BytesIO
+from io import BytesIO, TextIOWrapper
 from zipfile import ZipFile
+from ..metrics_storage import stream_month_csv
 from .helpers import get_host_header, get_client_addr, get_public_ip
 from .auth import login_required, get_current_user
 
@@ -445,6 +446,24 @@ def handle_download(handler, path: str) -> bool:
     if len(parts) != 3 or parts[0] != "admin" or parts[1] != "download":
         return False
     kind = parts[2]
+
+    # Month metrics export, e.g. /admin/download/metrics-2026-02. Rows are
+    # streamed from the month db straight to the response so large months
+    # don't get buffered in memory.
+    month_match = re.fullmatch(r"metrics-(\d{4}-\d{2})", kind)
+    if month_match:
+        month_key = month_match.group(1)
+        handler.send_response(200)
+        handler.send_header("Content-type", "text/csv; charset=utf-8")
+        handler.send_header("Content-Disposition", f'attachment; filename="metrics-{month_key}.csv"')
+        handler.end_headers()
+        out = TextIOWrapper(handler.wfile, encoding="utf-8", newline="")
+        try:
+            stream_month_csv(month_key, out)
+        finally:
+            out.detach()
+        return True
+
     if kind == "system-current":
         log_path = get_current_log_file_path()
         content = read_log_tail(log_path, 50)
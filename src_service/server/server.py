@@ -11,7 +11,7 @@ from urllib.parse import urlsplit
 
 from ..config import config
 from ..logging_utils import get_logger
-from ..openapi import get_openapi_spec
+from ..openapi import get_openapi_spec_json
 
 from .state import APPLICATION_JSON
 from . import routes_public
@@ -135,11 +135,11 @@ def _send_openapi_json(handler: BaseHTTPRequestHandler):
             host_for_spec = None
 
         get_logger().debug(f"OpenAPI request Host header: {host_header!r} proto={scheme!r}")
-        spec = get_openapi_spec(host=host_for_spec)
+        payload = get_openapi_spec_json(host=host_for_spec)
         handler.send_response(200)
         handler.send_header("Content-type", APPLICATION_JSON)
         handler.end_headers()
-        handler.wfile.write(json.dumps(spec).encode("utf-8"))
+        handler.wfile.write(payload)
     except Exception as e:
         get_logger().error(f"Failed to generate OpenAPI spec: {e}")
         handler.send_error(500, f"Failed to generate OpenAPI spec: {e}")
@@ -237,7 +237,14 @@ def _toggle_door_state(badge_id: Optional[str] = None):
 set_door_toggle_callback(_toggle_door_state)
 
 
-# Fallback to CSV if Google Sheets is unavailable
+# Fallback to CSV if Google Sheets is unavailable.
+# The file is read once into a set and re-read only when its mtime changes
+# (e.g. after a badge refresh), so each scan is a set lookup instead of a
+# full file parse.
+_csv_uid_cache: Optional[set] = None
+_csv_uid_cache_mtime: Optional[float] = None
+
+
 def check_local_csv(uid):
     """
     Check if UID exists in local CSV backup.
@@ -248,19 +255,21 @@ def check_local_csv(uid):
     Returns:
         True if UID found, False otherwise
     """
+    global _csv_uid_cache, _csv_uid_cache_mtime
     try:
-        with open(CSV_FILE, mode='r') as file:
-            reader = csv.reader(file)
-            for row in reader:
-                if row and row[0].strip().lower() == uid.lower():
-                    return True
+        mtime = os.path.getmtime(CSV_FILE)
+        if _csv_uid_cache is None or mtime != _csv_uid_cache_mtime:
+            with open(CSV_FILE, mode='r') as file:
+                reader = csv.reader(file)
+                _csv_uid_cache = {row[0].strip().lower() for row in reader if row}
+            _csv_uid_cache_mtime = mtime
     except FileNotFoundError as e:
         logger.error(f"Local CSV file '{CSV_FILE}' not found")
         raise e
     except Exception as e:
         logger.error(f"Error reading local CSV: {e}")
         raise e
-    return False
+    return uid.lower() in _csv_uid_cache
 
 
 # Manual polling function for buttons
@@ -299,6 +308,62 @@ def monitor_buttons(stop_event: threading.Event):
     logger.info("Button monitoring thread exiting")
 
 
+def _on_unlock_button(channel):
+    """Edge-detect callback for the unlock button (runs in GPIO's callback thread)."""
+    global last_unlock_time
+    # Confirm the pin is still low; spurious edges can fire on noisy lines
+    if GPIO.input(BUTTON_UNLOCK_PIN) != GPIO.LOW:
+        return
+    current_time = time.time()
+    if not get_door_status() and (current_time - last_unlock_time > debounce_time):
+        unlock_door()
+        last_unlock_time = current_time
+
+
+def _on_lock_button(channel):
+    """Edge-detect callback for the lock button (runs in GPIO's callback thread)."""
+    global last_lock_time
+    if GPIO.input(BUTTON_LOCK_PIN) != GPIO.LOW:
+        return
+    current_time = time.time()
+    if current_time - last_lock_time > debounce_time:
+        if get_door_status():
+            lock_door()
+        last_lock_time = current_time
+
+
+def setup_button_interrupts() -> bool:
+    """Register falling-edge interrupts for both buttons via GPIO.add_event_detect.
+
+    Interrupt-driven detection lets the kernel wake us only on actual button
+    presses instead of a thread polling the pins ten times a second. Returns
+    True when both handlers are registered; False when the backend doesn't
+    support event detection (e.g. the development stub), in which case the
+    caller should fall back to the `monitor_buttons` polling thread.
+    """
+    if not hasattr(GPIO, "add_event_detect"):
+        return False
+    bouncetime_ms = max(1, int(debounce_time * 1000))
+    try:
+        GPIO.add_event_detect(
+            BUTTON_UNLOCK_PIN, GPIO.FALLING, callback=_on_unlock_button, bouncetime=bouncetime_ms
+        )
+        GPIO.add_event_detect(
+            BUTTON_LOCK_PIN, GPIO.FALLING, callback=_on_lock_button, bouncetime=bouncetime_ms
+        )
+    except Exception as e:
+        logger.warning(f"Failed to register GPIO button interrupts: {e}")
+        # Undo any partial registration so the polling fallback starts clean
+        for pin in (BUTTON_UNLOCK_PIN, BUTTON_LOCK_PIN):
+            try:
+                GPIO.remove_event_detect(pin)
+            except Exception:
+                pass
+        return False
+    logger.info("Button interrupts registered (edge-triggered, no polling thread)")
+    return True
+
+
 # RFID reading and authentication logic
 from typing import Tuple
 
@@ -320,10 +385,18 @@ def _check_uid_from_sources(uid_hex: str) -> Tuple[bool, str]:
         return False, "Google Sheets"
 
 
+# A card held on the reader produces a read every poll; suppress repeats of
+# the same UID within this window instead of pausing the whole reader loop.
+SCAN_DEDUPE_SECONDS = 1.0
+
+
 def check_rfid(stop_event: threading.Event):
     """Monitor PN532 RFID reader and authenticate badges."""
     logger.info("RFID monitoring thread started")
 
+    last_uid = None
+    last_uid_time = 0.0
+
     while not stop_event.is_set():
         try:
             # Read the UID from the RFID card
@@ -332,6 +405,16 @@ def check_rfid(stop_event: threading.Event):
             if uid:
                 # Convert the UID to a hex string
                 uid_hex = ''.join(format(x, '02X') for x in uid).lower()
+
+                # Same card still on the reader: refresh the window and move on
+                now = time.monotonic()
+                if uid_hex == last_uid and now - last_uid_time < SCAN_DEDUPE_SECONDS:
+                    last_uid_time = now
+                    stop_event.wait(0.1)
+                    continue
+                last_uid = uid_hex
+                last_uid_time = now
+
                 logger.info(f"Card scanned with UID: {uid_hex}")
                 update_pn532_success()
 
@@ -357,8 +440,9 @@ def check_rfid(stop_event: threading.Event):
                     # Log to Google Sheets (best effort)
                     data_client.log_access(uid_hex, "Denied")
 
-                # Prevent multiple immediate reads but allow early exit on stop
-                stop_event.wait(1)
+                # No fixed wait here: the UID dedupe above suppresses repeat
+                # reads, so a different badge can scan immediately.
+                stop_event.wait(0.1)
             else:
                 # Short delay to avoid busy loop, but wake on stop
                 stop_event.wait(0.1)
@@ -380,14 +464,21 @@ def main():
         logger.info("Starting watchdog...")
         start_watchdog()
 
+        # Batch Google Sheets log writes off the RFID/button hot paths
+        data_client.start_log_batcher()
+
         logger.info("Starting worker threads...")
-        # Create separate threads for button monitoring and RFID checking
-        button_thread = threading.Thread(target=monitor_buttons, args=(stop_event,), daemon=False, name="ButtonMonitor")
+        # Prefer interrupt-driven buttons; fall back to the polling thread when
+        # the GPIO backend has no event detection (emulator/stub).
+        button_thread = None
+        if not setup_button_interrupts():
+            button_thread = threading.Thread(target=monitor_buttons, args=(stop_event,), daemon=False, name="ButtonMonitor")
         rfid_thread = threading.Thread(target=check_rfid, args=(stop_event,), daemon=False, name="RFIDMonitor")
         refresh_thread = threading.Thread(target=_schedule_daily_badge_refresh, args=(stop_event,), daemon=False, name="BadgeRefresh")
 
-        # Start both threads
-        button_thread.start()
+        # Start worker threads
+        if button_thread:
+            button_thread.start()
         rfid_thread.start()
         refresh_thread.start()
 
@@ -446,10 +537,17 @@ def main():
         except Exception:
             pass
 
+        # Flush any queued Google Sheets log rows before exiting
+        try:
+            data_client.stop_log_batcher()
+        except Exception:
+            pass
+
         # Join worker threads with timeout to avoid hanging
         logger.info("Waiting for worker threads to exit...")
         try:
-            button_thread.join(timeout=3)
+            if button_thread:
+                button_thread.join(timeout=3)
             rfid_thread.join(timeout=3)
             refresh_thread.join(timeout=3)
         except Exception:
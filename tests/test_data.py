@@ -1,6 +1,7 @@
 """Unit tests for Google Sheets data wrapper."""
 import unittest
 import tempfile
+import time
 import os
 import types
 from unittest.mock import MagicMock, patch
@@ -127,6 +128,80 @@ class TestGoogleSheetsData(unittest.TestCase):
         self.assertFalse(result)
         err_mock.assert_called_once()
 
+    def _connected_client_with_log_sheet(self):
+        data_client = GoogleSheetsData()
+        data_client._connected = True
+        data_client.log_sheet = MagicMock()
+        return data_client
+
+    def _wait_for_flush(self, log_sheet, timeout=2.0):
+        deadline = time.time() + timeout
+        while not log_sheet.append_rows.call_args_list and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_log_batcher_flushes_queued_rows_on_stop(self):
+        data_client = self._connected_client_with_log_sheet()
+        data_client.start_log_batcher()
+        try:
+            for i in range(3):
+                self.assertTrue(data_client.log_access(f"uid{i}", "Granted"))
+        finally:
+            data_client.stop_log_batcher()
+
+        # With the batcher running, nothing should go through append_row
+        data_client.log_sheet.append_row.assert_not_called()
+        rows = [
+            row
+            for call in data_client.log_sheet.append_rows.call_args_list
+            for row in call[0][0]
+        ]
+        self.assertEqual([r[1] for r in rows], ["uid0", "uid1", "uid2"])
+        self.assertEqual([r[2] for r in rows], ["Granted"] * 3)
+
+    def test_log_batcher_flushes_on_deadline(self):
+        data_client = self._connected_client_with_log_sheet()
+        with patch("src_service.data.LOG_BATCH_FLUSH_SECONDS", 0.05):
+            data_client.start_log_batcher()
+            try:
+                self.assertTrue(data_client.log_access("abc", "Granted"))
+                self._wait_for_flush(data_client.log_sheet)
+            finally:
+                data_client.stop_log_batcher()
+
+        calls = data_client.log_sheet.append_rows.call_args_list
+        self.assertEqual(len(calls), 1)
+        batch = calls[0][0][0]
+        self.assertEqual(len(batch), 1)
+        self.assertEqual(batch[0][1], "abc")
+
+    def test_log_batcher_flushes_at_max_rows(self):
+        data_client = self._connected_client_with_log_sheet()
+        # Long deadline so the only way to flush quickly is hitting max rows
+        with patch("src_service.data.LOG_BATCH_MAX_ROWS", 2), patch(
+            "src_service.data.LOG_BATCH_FLUSH_SECONDS", 5.0
+        ):
+            data_client.start_log_batcher()
+            try:
+                data_client.log_access("one", "Granted")
+                data_client.log_access("two", "Denied")
+                self._wait_for_flush(data_client.log_sheet)
+            finally:
+                data_client.stop_log_batcher()
+
+        calls = data_client.log_sheet.append_rows.call_args_list
+        self.assertEqual(len(calls), 1)
+        batch = calls[0][0][0]
+        self.assertEqual([r[1] for r in batch], ["one", "two"])
+
+    def test_stop_log_batcher_restores_synchronous_logging(self):
+        data_client = self._connected_client_with_log_sheet()
+        data_client.start_log_batcher()
+        data_client.stop_log_batcher()
+
+        with patch("src_service.data.update_last_google_log_success"):
+            self.assertTrue(data_client.log_access("ABC123", "Granted"))
+        data_client.log_sheet.append_row.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
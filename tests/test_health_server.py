@@ -446,6 +446,30 @@ class TestRequestHandler(unittest.TestCase):
                 for n in names:
                     self.assertIn(n, nlist)
 
+    def test_download_metrics_month_returns_csv(self):
+        """Downloading metrics-YYYY-MM should stream the month's events as CSV."""
+        def fake_stream(month_key, out):
+            out.write("ts,event_type,badge_id,status,raw_message\r\n")
+            out.write(f"2026-02-01 10:00:00,scan,abc,granted,{month_key}\r\n")
+
+        with patch("src_service.server.routes_admin.stream_month_csv", side_effect=fake_stream):
+            credentials = base64.b64encode(b"testuser:testpass").decode("ascii")
+            handler = self._create_handler(auth_header=f"Basic {credentials}", path="/admin/download/metrics-2026-02")
+            handler.do_GET()
+            body = handler.wfile.getvalue()
+            self.assertIn(b"text/csv", body)
+            self.assertIn(b'filename="metrics-2026-02.csv"', body)
+            self.assertIn(b"ts,event_type,badge_id,status,raw_message", body)
+            self.assertIn(b"2026-02-01 10:00:00,scan,abc,granted,2026-02", body)
+
+    def test_download_metrics_month_rejects_bad_key(self):
+        """A malformed month key should fall through to 404, not hit storage."""
+        credentials = base64.b64encode(b"testuser:testpass").decode("ascii")
+        handler = self._create_handler(auth_header=f"Basic {credentials}", path="/admin/download/metrics-bogus")
+        handler.do_GET()
+        body = handler.wfile.getvalue()
+        self.assertIn(b"404", body.split(b"\r\n", 1)[0])
+
     def test_refresh_badges_no_callback(self):
         """POST /api/refresh_badges without callback returns 503."""
         credentials = base64.b64encode(b"testuser:testpass").decode("ascii")
@@ -19,6 +19,13 @@ from src_service.metrics_storage import (
 
 
 class TestMetricsStorage(unittest.TestCase):
+    def tearDown(self):
+        # Each test uses its own temporary METRICS_DB_PATH, so drop the
+        # per-process caches keyed on resolved db paths between tests.
+        from src_service.metrics_storage import _ensured_month_db, _known_db_paths
+        _ensured_month_db.cache_clear()
+        _known_db_paths.clear()
+
     def test_ingest_action_log_file_creates_month_db(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             log_path = os.path.join(tmpdir, "door_controller_action-2026-02-01.txt")
@@ -88,6 +95,133 @@ class TestMetricsStorage(unittest.TestCase):
                 events = query_events_range("2026-01-01 00:00:00", "2026-12-31 23:59:59")
                 self.assertEqual(len(events), 2)
 
+    def test_db_paths_in_range_tracks_configured_base_path(self):
+        from src_service.metrics_storage import db_paths_in_range
+        today = date.today()
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            for tmpdir in (first, second):
+                with patch("src_service.metrics_storage.config.get", side_effect=lambda key, default=None, d=tmpdir: d if key == "METRICS_DB_PATH" else default):
+                    paths = db_paths_in_range(today, today)
+                # The current-month db must be created under the directory
+                # configured at call time, even after a query against another
+                self.assertEqual(len(paths), 1)
+                self.assertTrue(paths[0].startswith(tmpdir))
+                self.assertTrue(os.path.exists(paths[0]))
+
+    def test_ingest_preserves_non_action_lines(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = os.path.join(tmpdir, "door_controller_action-2026-02-01.txt")
+            noise = "2026-02-01 09:59:59 - door_action - INFO - Logger initialized\n"
+            action = "2026-02-01 10:00:00 - door_action - INFO - Badge Scan - Badge: abc - Status: Granted\n"
+            unparsable = "garbage with marker - Status: huh\n"
+            with open(log_path, "w", encoding="utf-8") as handle:
+                handle.write(noise)
+                handle.write(action)
+                handle.write(unparsable)
+
+            with patch("src_service.metrics_storage.config.get", side_effect=lambda key, default=None: tmpdir if key == "METRICS_DB_PATH" else default):
+                inserted = ingest_action_log_file(log_path)
+
+            self.assertEqual(inserted, 1)
+            # Parsed action lines are removed; everything else is written back
+            with open(log_path, "r", encoding="utf-8") as handle:
+                remaining = handle.read()
+            self.assertEqual(remaining, noise + unparsable)
+
+    def test_iter_events_range_merges_and_filters(self):
+        from src_service.metrics_storage import iter_events_range
+        with tempfile.TemporaryDirectory() as tmpdir:
+            rows_by_month = {
+                "2026-01": [
+                    ("2026-01-20 09:00:00", "open", None, "unlocked", "b"),
+                    ("2026-01-10 08:00:00", "scan", "abc", "granted", "a"),
+                ],
+                "2026-02": [
+                    ("2026-02-05 10:00:00", "scan", "def", "denied", "c"),
+                ],
+            }
+            for month_key, rows in rows_by_month.items():
+                ensure_month_db(month_key, base_path=tmpdir)
+                conn = sqlite3.connect(get_month_db_path(month_key, base_path=tmpdir))
+                conn.executemany(
+                    "INSERT INTO events (ts, event_type, badge_id, status, raw_message) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+                conn.close()
+
+            with patch("src_service.metrics_storage.config.get", side_effect=lambda key, default=None: tmpdir if key == "METRICS_DB_PATH" else default):
+                events = list(iter_events_range("2026-01-01 00:00:00", "2026-12-31 23:59:59"))
+                self.assertEqual(
+                    [e["ts"] for e in events],
+                    ["2026-01-10 08:00:00", "2026-01-20 09:00:00", "2026-02-05 10:00:00"],
+                )
+
+                scans = list(
+                    iter_events_range(
+                        "2026-01-01 00:00:00", "2026-12-31 23:59:59", event_types=["scan"]
+                    )
+                )
+                self.assertEqual([e["badge_id"] for e in scans], ["abc", "def"])
+                self.assertTrue(all(e["event_type"] == "scan" for e in scans))
+
+    def test_count_events_range_sums_months_and_filters(self):
+        from src_service.metrics_storage import count_events_range
+        with tempfile.TemporaryDirectory() as tmpdir:
+            rows_by_month = {
+                "2026-01": [
+                    ("2026-01-10 08:00:00", "scan", "abc", "granted", "a"),
+                    ("2026-01-10 08:00:05", "open", None, "unlocked", "b"),
+                ],
+                "2026-02": [
+                    ("2026-02-05 10:00:00", "scan", "def", "denied", "c"),
+                ],
+            }
+            for month_key, rows in rows_by_month.items():
+                ensure_month_db(month_key, base_path=tmpdir)
+                conn = sqlite3.connect(get_month_db_path(month_key, base_path=tmpdir))
+                conn.executemany(
+                    "INSERT INTO events (ts, event_type, badge_id, status, raw_message) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+                conn.close()
+
+            with patch("src_service.metrics_storage.config.get", side_effect=lambda key, default=None: tmpdir if key == "METRICS_DB_PATH" else default):
+                total = count_events_range("2026-01-01 00:00:00", "2026-12-31 23:59:59")
+                self.assertEqual(total, 3)
+
+                scans = count_events_range(
+                    "2026-01-01 00:00:00", "2026-12-31 23:59:59", event_types=["scan"]
+                )
+                self.assertEqual(scans, 2)
+
+                # ts bounds are honored: restrict to January only
+                january = count_events_range("2026-01-01 00:00:00", "2026-01-31 23:59:59")
+                self.assertEqual(january, 2)
+
+    def test_month_events_to_csv_wraps_stream(self):
+        from src_service.metrics_storage import CSV_HEADER, month_events_to_csv
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ensure_month_db("2026-03", base_path=tmpdir)
+            conn = sqlite3.connect(get_month_db_path("2026-03", base_path=tmpdir))
+            conn.execute(
+                "INSERT INTO events (ts, event_type, badge_id, status, raw_message) VALUES (?, ?, ?, ?, ?)",
+                ("2026-03-05 12:00:00", "scan", "abc", "granted", "raw"),
+            )
+            conn.commit()
+            conn.close()
+
+            with patch("src_service.metrics_storage.config.get", side_effect=lambda key, default=None: tmpdir if key == "METRICS_DB_PATH" else default):
+                csv_text = month_events_to_csv("2026-03")
+                lines = csv_text.strip().splitlines()
+                self.assertEqual(lines[0], ",".join(CSV_HEADER))
+                self.assertEqual(lines[1], "2026-03-05 12:00:00,scan,abc,granted,raw")
+
+                # Missing month db still yields just the header
+                empty_csv = month_events_to_csv("2025-01")
+                self.assertEqual(empty_csv.strip(), ",".join(CSV_HEADER))
+
     def test_parse_action_message_normalization(self):
         from src_service.metrics_storage import parse_action_log_line
         cases = [